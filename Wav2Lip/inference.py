@@ -1,7 +1,7 @@
 from os import listdir, path
 import numpy as np
 import scipy, cv2, os, sys, argparse, audio
-import json, subprocess, random, string
+import json, subprocess, random, string, bisect
 from tqdm import tqdm
 from glob import glob
 import torch, face_detection
@@ -82,6 +82,14 @@ def face_detect(images):
 	batch_size = args.face_det_batch_size
 	with open('frame_per_speaker.json', 'r') as f:
     		frame_per_speaker = json.load(f)
+	if isinstance(frame_per_speaker, dict):
+		# Run-length encoded [[start_frame, end_frame, speaker], ...]
+		rle = frame_per_speaker['rle']
+		run_starts = [run[0] for run in rle]
+		get_frame_speaker = lambda n: rle[bisect.bisect_right(run_starts, n) - 1][2]
+	else:
+		# Legacy flat one-label-per-frame list
+		get_frame_speaker = lambda n: frame_per_speaker[n]
 	while 1:
 		predictions = []
 		pady1, pady2, padx1, padx2 = args.pads
@@ -93,7 +101,7 @@ def face_detect(images):
 					predictions.extend([None])
 				else:	
 					rect = rect[0]
-					supposed_speaker = frame_per_speaker[i]
+					supposed_speaker = get_frame_speaker(i)
 					if i % 20 == 0:
 						try:
 							image = np.array(images[i:i + batch_size])[0]
@@ -218,7 +226,11 @@ def load_model(path):
 	model.load_state_dict(new_s)
 
 	model = model.to(device)
-	return model.eval()
+	model = model.eval()
+	if device == 'cuda' and hasattr(torch, 'compile'):
+		# Compiled once per process; every subsequent batch reuses the graph
+		model = torch.compile(model, mode='reduce-overhead', fullgraph=False)
+	return model
 
 def main():
 	if not os.path.isfile(args.face):
@@ -302,7 +314,13 @@ def main():
 		mel_batch = torch.FloatTensor(np.transpose(mel_batch, (0, 3, 1, 2))).to(device)
 
 		with torch.no_grad():
-			pred = model(mel_batch, img_batch)
+			if device == 'cuda':
+				# FP16 halves the activation bandwidth of the generator stack
+				with torch.autocast('cuda', dtype=torch.float16):
+					pred = model(mel_batch, img_batch)
+				pred = pred.float()
+			else:
+				pred = model(mel_batch, img_batch)
 
 		pred = pred.cpu().numpy().transpose(0, 2, 3, 1) * 255.
 		
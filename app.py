@@ -15,7 +15,7 @@ install_if_not_installed('protobuf', 'pip install protobuf==3.19.6')
 install_if_not_installed('spacy', 'pip install spacy==3.8.2')
 install_if_not_installed('TTS', 'pip install --no-deps TTS==0.21.0')
 install_if_not_installed('packaging', 'pip install packaging==20.9')
-install_if_not_installed('openai-whisper', 'pip install openai-whisper==20240930')
+install_if_not_installed('faster_whisper', 'pip install faster-whisper==1.1.0')
 install_if_not_installed('deepface', 'pip install deepface==0.0.93')
 install_if_not_installed('google.cloud.texttospeech', 'pip install google-cloud-texttospeech==2.16.3')
 install_if_not_installed('requests', 'pip install requests==2.31.0')
@@ -23,24 +23,37 @@ os.system('pip install numpy==1.26.4 > /dev/null 2>&1')
 
 from pyannote.audio import Pipeline
 from audio_separator.separator import Separator
-import whisper
-from transformers import MarianMTModel, MarianTokenizer
+from faster_whisper import WhisperModel, BatchedInferencePipeline
+import ctranslate2
+from transformers import MarianTokenizer
 from TTS.api import TTS
 from pydub import AudioSegment
 import shutil
 import subprocess
+import threading
+import queue
+import asyncio
 import torch
+import torchaudio
 from speechbrain.inference.interfaces import foreign_class
 from deepface import DeepFace
 import numpy as np
 import cv2
 import json
 import re
+import httpx
 from groq import Groq
 from IPython.display import HTML, Audio
 from base64 import b64decode
 from scipy.io.wavfile import read as wav_read
+from scipy.io import wavfile
 import io
+import functools
+import hashlib
+import shelve
+import tempfile
+import wave
+from collections import defaultdict
 import ffmpeg
 from IPython.display import clear_output 
 import sys, argparse
@@ -48,10 +61,16 @@ from dotenv import load_dotenv
 import nltk
 from nltk.tokenize import sent_tokenize
 import warnings
+from tools.utils import fresh_dir
+from tools.utils import Segments
 from tools.utils import merge_overlapping_periods
+from tools.utils import align_sentences_to_words
 from tools.utils import get_speaker
+from tools.utils import get_frame_speakers
 from tools.utils import extract_frames
 from tools.utils import detect_and_crop_faces
+from tools.utils import detect_and_crop_faces_batch
+from tools.utils import create_face_detector
 from tools.utils import cosine_similarity
 from tools.utils import extract_and_save_most_common_face
 from tools.utils import get_overlap
@@ -65,6 +84,38 @@ warnings.filterwarnings("ignore")
 load_dotenv()
 
 
+@functools.lru_cache(maxsize=4)
+def load_marian(model_name, device):
+    """Load a MarianMT tokenizer and an int8 CTranslate2 translator.
+
+    The weights are converted and quantized once per language pair and
+    cached under marian-ct2/, then served by ctranslate2.Translator, which
+    halves the bytes streamed per generated token.
+    """
+    tokenizer = MarianTokenizer.from_pretrained(model_name)
+
+    ct2_dir = os.path.join("marian-ct2", model_name.split("/")[-1])
+    if not os.path.exists(ct2_dir):
+        ctranslate2.converters.TransformersConverter(model_name).convert(ct2_dir, quantization="int8")
+
+    translator = ctranslate2.Translator(ct2_dir, device=device.type, compute_type="int8")
+    return tokenizer, translator
+
+
+# Shared across Gradio requests: the translation service is built once, and
+# XTTS access is serialized behind a lock because the model isn't thread-safe
+_gpu_lock = threading.Lock()
+_service_lock = threading.Lock()
+_translation_service = None
+
+
+def get_translation_service():
+    global _translation_service
+    with _service_lock:
+        if _translation_service is None:
+            _translation_service = setup_translation_service()
+    return _translation_service
+
 
 class VideoDubbing:
     def __init__(self, Video_path, source_language, target_language, 
@@ -83,28 +134,54 @@ class VideoDubbing:
         self.use_google_tts = use_google_tts
         self.translation_provider = translation_provider
         
-        os.system("rm -r audio")
-        os.system("mkdir audio")
-
-
-        os.system("rm -r results")
-        os.system("mkdir results")
+        fresh_dir("audio")
+        fresh_dir("results")
         
         device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
         # Initialize the pre-trained speaker diarization pipeline
         pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization",
                                      use_auth_token=self.huggingface_auth_token).to(device)
-        
-        # Load the audio from the video file
-        audio = AudioSegment.from_file(self.Video_path, format="mp4")
-        audio.export("audio/test0.wav", format="wav")
-        
-        
+
+        # The checkpoint defaults to FP32 and a fine sliding stride; on GPU,
+        # halve the activation bandwidth and coarsen the segmentation step,
+        # and raise the batch sizes so the models see full batches
+        try:
+            if device.type == 'cuda':
+                pipeline._segmentation.model.half()
+                pipeline._segmentation.step = 0.5
+            pipeline.segmentation_batch_size = 32
+            pipeline.embedding_batch_size = 32
+        except AttributeError:
+            pass
+        
+        # Decode the video's audio exactly once through an ffmpeg pipe: the
+        # 44.1 kHz mono buffer feeds the source separator, and the 16 kHz
+        # resampled copy is shared by diarization, transcription and the
+        # emotion classifier, so no stage re-demuxes the video
+        decoded, _ = (
+            ffmpeg.input(self.Video_path)
+            .output('pipe:', format='f32le', ac=1, ar=44100)
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+        waveform_44k = torch.from_numpy(
+            np.frombuffer(decoded, dtype=np.float32).copy()
+        ).unsqueeze(0)
+        torchaudio.save("audio/source_44k.wav", waveform_44k, 44100)
+
+        waveform = torchaudio.functional.resample(waveform_44k, 44100, 16000)
+        sample_rate = 16000
+        torchaudio.save("audio/test0.wav", waveform, sample_rate)
+
+
         audio_file = "audio/test0.wav"
-        
-        # Apply the diarization pipeline on the audio file
-        diarization = pipeline(audio_file)
+
+        # Apply the diarization pipeline on the in-memory waveform
+        if device.type == 'cuda':
+            with torch.autocast('cuda', dtype=torch.float16):
+                diarization = pipeline({"waveform": waveform.to(device), "sample_rate": sample_rate})
+        else:
+            diarization = pipeline({"waveform": waveform.to(device), "sample_rate": sample_rate})
         speakers_rolls ={}
         
         # Print the diarization results
@@ -133,51 +210,35 @@ class VideoDubbing:
             
             
             
-            frame_per_speaker = []
-            
-            for i in range(total_frames):
-                time = i/round(fps)
-                frame_speaker = get_speaker(time, speakers_rolls)
-                frame_per_speaker.append(frame_speaker)
-                # print(time)
-            
-            os.system("rm -r speakers_image")
-            os.system("mkdir speakers_image")
-            
-            
-            
+            frame_per_speaker = get_frame_speakers(total_frames, fps, speakers_rolls)
+
+            fresh_dir("speakers_image")
+
+
             # Specify the video path and output folder
             output_folder = "speakers_image"
             # Call the function
             extract_frames(self.Video_path, output_folder, speakers_rolls)
             
-            # Initialize the MTCNN face detector
-            haar_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            
-            # Load the pre-trained Haar Cascade model for face detection
-            face_cascade = cv2.CascadeClassifier(haar_cascade_path)
-            
-            # Function to detect and crop faces
-            
+            # Face detector: the DNN model batched on CUDA when available,
+            # the Haar cascade on CPU otherwise
+            face_detector = create_face_detector()
+
             # Path to the folder containing speaker images
             speaker_images_folder = "speakers_image"
-            
+
             # Iterate through speaker subfolders
             for speaker_folder in os.listdir(speaker_images_folder):
                 speaker_folder_path = os.path.join(speaker_images_folder, speaker_folder)
-            
+
                 if os.path.isdir(speaker_folder_path):
-                    # Process each image in the speaker folder
-                    for image_name in os.listdir(speaker_folder_path):
-                        image_path = os.path.join(speaker_folder_path, image_name)
-            
-                        # Detect and crop faces from the image
-                        if not detect_and_crop_faces(image_path, face_cascade):
-                            # If no face is detected, delete the image
-                            os.remove(image_path)
-                            print(f"Deleted {image_path} due to no face detected.")
-                        else:
-                            print(f"Face detected and cropped: {image_path}")
+                    # Detect and crop all the speaker's frames in one batched pass
+                    image_paths = [os.path.join(speaker_folder_path, image_name)
+                                   for image_name in os.listdir(speaker_folder_path)]
+                    for image_path in detect_and_crop_faces_batch(image_paths, face_detector):
+                        # If no face is detected, delete the image
+                        os.remove(image_path)
+                        print(f"Deleted {image_path} due to no face detected.")
             
             
         
@@ -189,20 +250,31 @@ class VideoDubbing:
                 print(f"Processing images in folder: {speaker_folder}")
                 extract_and_save_most_common_face(speaker_folder_path)
 
-            for root, dirs, files in os.walk(speaker_images_folder):
-                for file in files:
-                    # Check if the file is not 'max_image.jpg'
-                    if file != "max_image.jpg":
-                        # Construct full file path
-                        file_path = os.path.join(root, file)
-                        # Delete the file
-                        os.remove(file_path)
+            # Keep only max_image.jpg per speaker: move it aside, drop the
+            # whole folder with one rmtree and move it back, instead of an
+            # os.remove syscall per extracted frame
+            for speaker_folder in os.listdir(speaker_images_folder):
+                speaker_folder_path = os.path.join(speaker_images_folder, speaker_folder)
+                if not os.path.isdir(speaker_folder_path):
+                    continue
+
+                max_image_path = os.path.join(speaker_folder_path, "max_image.jpg")
+                if os.path.exists(max_image_path):
+                    tmp_folder = tempfile.mkdtemp()
+                    shutil.move(max_image_path, tmp_folder)
+                    shutil.rmtree(speaker_folder_path)
+                    os.mkdir(speaker_folder_path)
+                    shutil.move(os.path.join(tmp_folder, "max_image.jpg"), speaker_folder_path)
+                    os.rmdir(tmp_folder)
+                else:
+                    shutil.rmtree(speaker_folder_path)
+                    os.mkdir(speaker_folder_path)
             
             
             
-            # Save to a file
+            # Save the run-length encoded speaker runs to a file
             with open('frame_per_speaker.json', 'w') as f:
-                json.dump(frame_per_speaker, f)
+                json.dump({"rle": frame_per_speaker}, f)
             
             
             if os.path.exists("Wav2Lip/frame_per_speaker.json"):
@@ -218,38 +290,64 @@ class VideoDubbing:
             
         ###############################################################################
         
-        os.system("rm -r speakers_audio")
-        os.system("mkdir speakers_audio")
-        
-        speakers = set(list(speakers_rolls.values()))
-        audio = AudioSegment.from_file(audio_file, format="mp4")
-        
-        for speaker in speakers:
-            speaker_audio = AudioSegment.empty()
-            for key, value in speakers_rolls.items():
-                if speaker == value:
-                    start = int(key[0])*1000
-                    end = int(key[1])*1000
-                    
-                    speaker_audio += audio[start:end]
-                    
+        fresh_dir("speakers_audio")
         
+        audio = AudioSegment.from_file(audio_file)
+
+        # Group the speech turns per speaker and concatenate raw sample slices
+        # with NumPy: one copy per speaker instead of pydub's grow-by-append,
+        # which recopies the whole buffer on every turn
+        speaker_ranges = defaultdict(list)
+        for key, value in speakers_rolls.items():
+            start = int(key[0]) * audio.frame_rate
+            end = int(key[1]) * audio.frame_rate
+            speaker_ranges[value].append((start, end))
+
+        dtype = {1: np.int8, 2: np.int16, 4: np.int32}[audio.sample_width]
+        samples = np.frombuffer(audio.raw_data, dtype=dtype).reshape(-1, audio.channels)
+
+        for speaker, ranges in speaker_ranges.items():
+            speaker_samples = np.concatenate([samples[start:end] for start, end in ranges])
+            speaker_audio = AudioSegment(
+                data=speaker_samples.tobytes(),
+                sample_width=audio.sample_width,
+                frame_rate=audio.frame_rate,
+                channels=audio.channels,
+            )
             speaker_audio.export(f"speakers_audio/{speaker}.wav", format="wav")
         
         most_occured_speaker= max(list(speakers_rolls.values()),key=list(speakers_rolls.values()).count)
         
-        model = whisper.load_model(self.whisper_model, device=device)
-        transcript = model.transcribe(
+        # Source separation is CPU/ONNX-bound and independent of the speech
+        # stages, so start it in the background while Whisper has the GPU;
+        # the result is joined right before the final overlay
+        separator = Separator()
+        separator.load_model(model_filename='2_HP-UVR.pth')
+        separation_result = {}
+
+        def run_separation():
+            separation_result['path'] = separator.separate("audio/source_44k.wav")[0]
+
+        separation_thread = threading.Thread(target=run_separation)
+        separation_thread.start()
+
+        model = WhisperModel(self.whisper_model, device=device.type,
+                             compute_type="int8_float16" if device.type == "cuda" else "int8")
+        batched_model = BatchedInferencePipeline(model=model)
+        # Transcribe the already decoded 16 kHz waveform so batched VAD chunks
+        # run through the GPU together instead of sequential 30 s windows
+        segments, info = batched_model.transcribe(
+            waveform.squeeze(0).cpu().numpy(),
+            batch_size=16,
             word_timestamps=True,
-            audio=self.Video_path,
           )
-			 
+
         time_stamped = []
         full_text = []
-        for segment in transcript['segments']:
-            for word in segment['words']:
-                time_stamped.append([word['word'],word['start'],word['end']])
-                full_text.append(word['word'])
+        for segment in segments:
+            for word in segment.words:
+                time_stamped.append([word.word, word.start, word.end])
+                full_text.append(word.word)
         full_text = "".join(full_text)
        
         # Decompose Long Sentences
@@ -265,32 +363,8 @@ class VideoDubbing:
             sentences.append(sentence)
 
         
-        time_stamped_sentances = {}
-        count_sentances = {}
-        
-        letter = 0
-        for i in range(len(sentences)):
-            tmp = []
-            starts = []
-            
-            for j in range(len(sentences[i])):
-                letter += 1
-                tmp.append(sentences[i][j])
-                
-                f = 0
-                for k in range(len(time_stamped)):
-                    for m in range(len(time_stamped[k][0])):
-                        f += 1
-                        
-                        if f == letter:
-        
-                            starts.append(time_stamped[k][1])
-                       
-                            starts.append(time_stamped[k][2])
-            letter += 1               
-                            
-            time_stamped_sentances["".join(tmp)] = [min(starts), max(starts)]
-            count_sentances[i+1] = "".join(tmp)
+        time_stamped_sentances = align_sentences_to_words(sentences, time_stamped, full_text)
+        count_sentances = {i + 1: sentence for i, sentence in enumerate(sentences)}
 
         record = []
         print(time_stamped_sentances)
@@ -365,11 +439,36 @@ class VideoDubbing:
     
 
         # Initialize enhanced translation service
-        translation_service = setup_translation_service()
-        
+        translation_service = get_translation_service()
+
+        # One Groq client for the whole video: a keep-alive HTTP/2 connection
+        # is multiplexed across all sentence requests instead of paying a TLS
+        # handshake per call
+        if self.Context_translation and self.Context_translation != "API code here":
+            self._groq_client = Groq(
+                api_key=self.Context_translation,
+                http_client=httpx.Client(http2=True,
+                                         limits=httpx.Limits(max_keepalive_connections=8)),
+            )
+
+        # Disk-backed translation cache keyed by language pair and sentence
+        # hash, so repeated phrases never hit the model or the API twice
+        translation_cache = shelve.open('.translation_cache')
+
+        def translation_cache_key(sentence):
+            normalized = " ".join(sentence.split()).lower()
+            return f"{self.source_language}|{self.target_language}|{hashlib.sha1(normalized.encode()).hexdigest()}"
+
         if not self.Context_translation or self.Context_translation == "API code here":
-            # Function to translate text using MarianMT (fallback)
-            def translate(sentence):
+            # Translate with MarianMT (fallback); the model is loaded once per
+            # language pair and all sentences go through generate() in batches
+            def translate_batch(sentences_to_translate):
+                keys = [translation_cache_key(sentence) for sentence in sentences_to_translate]
+                results = [translation_cache.get(key) for key in keys]
+                missing = [i for i, result in enumerate(results) if result is None]
+                if not missing:
+                    return results
+
                 if self.source_language == 'tr':
                     model_name = f"Helsinki-NLP/opus-mt-trk-{self.target_language}"
                 elif self.target_language == 'tr':
@@ -380,16 +479,33 @@ class VideoDubbing:
                     model_name = f"Helsinki-NLP/opus-mt-{self.source_language}-zh"
                 else:
                     model_name = f"Helsinki-NLP/opus-mt-{self.source_language}-{self.target_language}"
-	
-                tokenizer = MarianTokenizer.from_pretrained(model_name)
-                model = MarianMTModel.from_pretrained(model_name).to(device)
 
-                inputs = tokenizer([sentence], return_tensors="pt", padding=True).to(device)
-                translated = model.generate(**inputs)
-                return tokenizer.decode(translated[0], skip_special_tokens=True)
+                tokenizer, translator = load_marian(model_name, device)
+
+                source_tokens = [tokenizer.convert_ids_to_tokens(tokenizer.encode(sentences_to_translate[i]))
+                                 for i in missing]
+                # Beam of 6 matches the HF Marian default; int8 alone carries
+                # the speedup without trading away translation quality
+                translated = translator.translate_batch(source_tokens, beam_size=6)
+                texts = [tokenizer.decode(tokenizer.convert_tokens_to_ids(result.hypotheses[0]),
+                                          skip_special_tokens=True)
+                         for result in translated]
+
+                for i, text in zip(missing, texts):
+                    results[i] = text
+                    translation_cache[keys[i]] = text
+                return results
+
+            def translate(sentence):
+                return translate_batch([sentence])[0]
         else:
             # Use enhanced translation service with multiple providers
             def translate(sentence, before_context="", after_context=""):
+                key = translation_cache_key(sentence)
+                cached = translation_cache.get(key)
+                if cached is not None:
+                    return cached
+
                 # Try enhanced translation service first
                 result = translation_service.translate(
                     sentence=sentence,
@@ -398,14 +514,14 @@ class VideoDubbing:
                     target_language=self.target_language,
                     provider=self.translation_provider
                 )
-                
+
                 if result:
+                    translation_cache[key] = result
                     return result
-                
+
                 # Fallback to original Groq implementation
                 try:
-                    client = Groq(api_key=self.Context_translation)
-                    chat_completion = client.chat.completions.create(
+                    chat_completion = self._groq_client.chat.completions.create(
                         messages=[
                             {
                                 "role": "user",
@@ -431,90 +547,126 @@ class VideoDubbing:
                     match = re.search(pattern, chat_completion.choices[0].message.content)
                     
                     if match:
-                        return match.group(1)
+                        result = match.group(1)
                     else:
-                        return chat_completion.choices[0].message.content.strip()
+                        result = chat_completion.choices[0].message.content.strip()
+                    translation_cache[key] = result
+                    return result
                 except Exception as e:
                     print(f"Translation fallback failed: {e}")
                     return sentence  # Return original if all translation methods fail
-                    
-               
 
-        
+            def translate_all(sentences):
+                """Translate every uncached sentence in one concurrent fan-out.
+
+                Mirrors the Marian branch's upfront batch: instead of one
+                blocking API round trip per sentence inside the record loop,
+                all misses go through translate_batch at once and only
+                stragglers fall back to the per-sentence path.
+                """
+                keys = [translation_cache_key(sentence) for sentence in sentences]
+                results = [translation_cache.get(key) for key in keys]
+                missing = [i for i, result in enumerate(results) if result is None]
+
+                # translate_batch tries OpenRouter before Groq, so it only
+                # honors the provider choice outside the groq-only setting
+                if missing and self.translation_provider != "groq":
+                    segments = [(sentences[i],
+                                 sentences[i-1] if i > 0 else "",
+                                 sentences[i+1] if i + 1 < len(sentences) else "")
+                                for i in missing]
+                    # The service's HTTP client is bound to the event loop it
+                    # runs on, so close it inside the same asyncio.run before
+                    # that loop is torn down
+                    async def run_batch():
+                        try:
+                            return await translation_service.translate_batch(
+                                segments, target_language=self.target_language)
+                        finally:
+                            await translation_service.aclose()
+
+                    try:
+                        batch = asyncio.run(run_batch())
+                    except Exception as e:
+                        print(f"Batch translation failed, falling back per sentence: {e}")
+                        batch = [None] * len(missing)
+                    for i, result in zip(missing, batch):
+                        if result:
+                            results[i] = result
+                            translation_cache[keys[i]] = result
+
+                for i in range(len(results)):
+                    if results[i] is None:
+                        results[i] = translate(
+                            sentence=sentences[i],
+                            before_context=sentences[i-1] if i > 0 else "",
+                            after_context=sentences[i+1] if i + 1 < len(sentences) else ""
+                        )
+                return results
+
+
         records = []
-        
-        audio = AudioSegment.from_file(audio_file, format="mp4")
-        for i in range(len(new_record)):
-            final_sentance = new_record[i][0]
-            
-            if not self.Context_translation or self.Context_translation == "API code here":
-                translated = translate(sentence=final_sentance)
-            else:
-                before_context = new_record[i-1][0] if i - 1 in range(len(new_record)) else ""
-                after_context = new_record[i+1][0] if i + 1 in range(len(new_record)) else ""
-                translated = translate(sentence=final_sentance, before_context=before_context, after_context=after_context)
-            
-            speaker = most_occured_speaker
-            
-            max_overlap = 0
-        
-            # Check overlap with each speaker's time range
-            for key, value in speakers_rolls.items():
-                speaker_start =  int(key[0])
-                speaker_end = int(key[1])
-                
-                # Calculate overlap
-                overlap = get_overlap((new_record[i][1], new_record[i][2]), (speaker_start, speaker_end))
-                
-                # Update speaker if this overlap is greater than previous ones
-                if overlap > max_overlap:
-                    max_overlap = overlap
-                    speaker = value
-                    
-            start = int(new_record[i][1]) *1000
-            end = int(new_record[i][2]) *1000
-        
-            try:
-                audio[start:end].export("audio/emotions.wav", format="wav")      
-                out_prob, score, index, text_lab = classifier.classify_file("audio/emotions.wav")
-                os.remove("audio/emotions.wav")
-            except:
-                text_lab = ['None']
-            
-            records.append([translated, final_sentance, new_record[i][1], new_record[i][2], speaker, emotion_dict[text_lab[0]]])
-            print(translated, final_sentance, new_record[i][1], new_record[i][2], speaker, emotion_dict[text_lab[0]])
-        
-        
-        
+
+        if not self.Context_translation or self.Context_translation == "API code here":
+            marian_translations = translate_batch([row[0] for row in new_record])
+        else:
+            api_translations = translate_all([row[0] for row in new_record])
+
+        # Classify the emotion of every segment in one batched forward pass on
+        # slices of the in-memory waveform, instead of exporting a wav per
+        # segment and classifying it from disk
+        try:
+            segment_waves = []
+            for sentence, seg_start, seg_end in new_record:
+                segment = waveform[0, int(seg_start * 16000):int(seg_end * 16000)]
+                if segment.numel() == 0:
+                    segment = torch.zeros(1600)
+                segment_waves.append(segment)
+
+            lengths = torch.tensor([len(segment) for segment in segment_waves], dtype=torch.float)
+            batch = torch.nn.utils.rnn.pad_sequence(segment_waves, batch_first=True)
+            out_prob, score, index, text_lab = classifier.classify_batch(batch, lengths / lengths.max())
+            segment_labels = list(text_lab)
+        except:
+            segment_labels = ['None'] * len(new_record)
+
         # Initialize Enhanced TTS system
         google_credentials_path = setup_google_cloud_credentials()
         enhanced_tts = EnhancedTTS(
             use_google_tts=self.use_google_tts and google_credentials_path is not None,
             google_credentials_path=google_credentials_path
         )
-        
-        os.system("rm -r audio_chunks")
-        os.system("rm -r su_audio_chunks")
-        os.system("mkdir audio_chunks")
-        os.system("mkdir su_audio_chunks")
 
-        natural_scilence = records[0][2]
-        previous_silence_time = 0
-        
-        if natural_scilence >= 0.8:
-            previous_silence_time = 0.8
-            natural_scilence -= 0.8
-        else:
-            previous_silence_time = natural_scilence
-            natural_scilence = 0   
-            
-        combined = AudioSegment.silent(duration=natural_scilence*1000) 
+        fresh_dir("audio_chunks")
+        fresh_dir("su_audio_chunks")
+
+        # The leading/trailing silences only depend on the segment timestamps,
+        # so the whole schedule comes out of a few vectorized expressions on
+        # the struct-of-arrays layout: each inter-segment silence budget is
+        # capped at 0.8 s before the chunk, with the remainder carried as
+        # trailing padding after the previous chunk
+        segments_soa = Segments.from_rows(new_record)
+        budgets = np.concatenate([[segments_soa.starts[0]], segments_soa.gaps])
+        previous_silences = np.minimum(budgets, 0.8)
+        overflow = np.maximum(budgets - 0.8, 0)
+        leading_silence = overflow[0]
+        trailing_naturals = np.append(overflow[1:], 0)
 
         tip = 350
-        
-        for i in range(len(records)):
-            print('previous_silence_time: ', previous_silence_time)
-            
+
+        # Repeated phrases ("Yeah.", catchphrases) synthesize once: later
+        # occurrences copy the already-trimmed wav of the first one
+        tts_memo = {}
+
+        def synthesize_chunk(i):
+            print('previous_silence_time: ', previous_silences[i])
+
+            memo_key = (records[i][0], records[i][4])
+            memo_path = tts_memo.get(memo_key)
+            if memo_path is not None:
+                shutil.copyfile(memo_path, f"audio_chunks/{i}.wav")
+                return True
+
             # Use enhanced TTS system
             if self.use_google_tts and google_credentials_path:
                 # Use Google TTS
@@ -526,109 +678,187 @@ class VideoDubbing:
                     gender='NEUTRAL'  # You can make this configurable
                 )
             else:
-                # Use Coqui TTS (original behavior)
-                audio_result = enhanced_tts.synthesize_speech(
-                    text=records[i][0],
-                    language_code=self.target_language,
-                    speaker_wav=f"speakers_audio/{records[i][4]}.wav",
-                    emotion=records[i][5],
-                    speed=2,
-                    output_path=f"audio_chunks/{i}.wav"
-                )
-            
+                # Use Coqui XTTS through the latent-cached batch path: the
+                # speaker latents are computed once per reference wav and the
+                # segment comes back in memory, skipping a tempfile round
+                # trip. Access is serialized since Gradio jobs share one model
+                with _gpu_lock:
+                    batch = enhanced_tts.synthesize_batch(
+                        [records[i][0]],
+                        [f"speakers_audio/{records[i][4]}.wav"],
+                        self.target_language,
+                        speed=2
+                    )
+                audio_result = batch[0] if batch else None
+
             if audio_result is None:
                 print(f"Failed to synthesize audio for segment {i}")
-                continue
-            
-            audio = AudioSegment.from_file(f"audio_chunks/{i}.wav")
+                return False
+
+            if isinstance(audio_result, AudioSegment):
+                audio = audio_result
+            else:
+                audio = AudioSegment.from_file(f"audio_chunks/{i}.wav")
             audio = audio[:len(audio)-tip]
             audio.export(f"audio_chunks/{i}.wav", format="wav")
-            
-            lt = len(audio) / 1000.0 
-            lo =  max(records[i][3] - records[i][2], 0)
-            theta = lo/lt
-          
-            input_file = f"audio_chunks/{i}.wav"
-            output_file = f"su_audio_chunks/{i}.wav"
+            tts_memo[memo_key] = f"audio_chunks/{i}.wav"
+            return True
 
-           
-            if theta <1 and theta > 0.44:
-                print('############################')
-                theta_prim = (lo+previous_silence_time)/lt
-                command = f"ffmpeg -i {input_file} -filter:a 'atempo={1/theta_prim}' -vn {output_file}"
-                process = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                if process.returncode != 0:
-                    sc = lo  + previous_silence_time
-                    silence = AudioSegment.silent(duration=(sc*1000))
-                    silence.export(output_file, format="wav")
-            elif theta < 0.44:
-                silence = AudioSegment.silent(duration=((lo+previous_silence_time)*1000))
-                silence.export(output_file, format="wav")
+        # Pipeline translation with synthesis: the loop below pushes each
+        # finished record into a bounded queue and a consumer thread runs TTS
+        # on it, so translating segment N overlaps synthesizing segment N-1
+        tts_queue = queue.Queue(maxsize=4)
+        synthesized = []
+
+        def tts_worker():
+            while True:
+                chunk_index = tts_queue.get()
+                if chunk_index is None:
+                    return
+                if synthesize_chunk(chunk_index):
+                    synthesized.append(chunk_index)
+
+        tts_thread = threading.Thread(target=tts_worker)
+        tts_thread.start()
+
+        for i in range(len(new_record)):
+            final_sentance = new_record[i][0]
+
+            if not self.Context_translation or self.Context_translation == "API code here":
+                translated = marian_translations[i]
             else:
-                silence = AudioSegment.silent(duration=(previous_silence_time*1000))
-                audio = silence  + audio
-                audio.export(output_file, format="wav")
+                translated = api_translations[i]
+
+            speaker = most_occured_speaker
+            
+            max_overlap = 0
         
+            # Check overlap with each speaker's time range
+            for key, value in speakers_rolls.items():
+                speaker_start =  int(key[0])
+                speaker_end = int(key[1])
                 
-            audio = AudioSegment.from_file(output_file)
-            lt = len(audio) / 1000.0
-            lo =  records[i][3]-records[i][2]+ previous_silence_time
-            if i+1 < len(records):
-                natural_scilence = max(records[i+1][2]-records[i][3], 0) 
-                if natural_scilence >= 0.8:
-                    previous_silence_time = 0.8
-                    natural_scilence -= 0.8
-                else:
-                    previous_silence_time = natural_scilence
-                    natural_scilence = 0
+                # Calculate overlap
+                overlap = get_overlap((new_record[i][1], new_record[i][2]), (speaker_start, speaker_end))
                 
+                # Update speaker if this overlap is greater than previous ones
+                if overlap > max_overlap:
+                    max_overlap = overlap
+                    speaker = value
                     
-                silence = AudioSegment.silent(duration=((max(lo-lt,0)+natural_scilence)*1000))
-                audio_with_silence = audio + silence
-                audio_with_silence.export(output_file, format="wav")
+            records.append([translated, final_sentance, new_record[i][1], new_record[i][2], speaker, emotion_dict[segment_labels[i]]])
+            print(translated, final_sentance, new_record[i][1], new_record[i][2], speaker, emotion_dict[segment_labels[i]])
+            tts_queue.put(i)
+
+        tts_queue.put(None)
+        tts_thread.join()
+
+        translation_cache.close()
+
+        sample_rate_out = 24000
+        if synthesized:
+            with wave.open(f"audio_chunks/{synthesized[0]}.wav", 'rb') as chunk_wav:
+                sample_rate_out = chunk_wav.getframerate()
+
+        def chunk_filter(i, input_index):
+            """Emit the filter chain reproducing the stretch/silence/pad
+            decisions for chunk i.
+
+            Returns (uses_input, chain): silence-only chunks are generated by
+            anullsrc and consume no input file.
+            """
+            previous_silence_time = previous_silences[i]
+            trailing = trailing_naturals[i] if i+1 < len(records) else 0
+
+            with wave.open(f"audio_chunks/{i}.wav", 'rb') as chunk_wav:
+                lt = chunk_wav.getnframes() / chunk_wav.getframerate()
+            lo =  max(records[i][3] - records[i][2], 0)
+            theta = lo/lt
+
+            if theta <1 and theta > 0.44:
+                # atempo only accepts [0.5, 100]; pad-then-trim to the exact
+                # slot afterwards so a clamped rate can't change the chunk's
+                # length and shift every later chunk in the concatenation
+                rate = min(max(lt/(lo+previous_silence_time), 0.5), 100.0)
+                slot = lo + previous_silence_time + trailing
+                return True, f"[{input_index}:a]atempo={rate:.6f},apad,atrim=duration={slot:.3f}[a{i}]"
+            elif theta < 0.44:
+                duration = lo + previous_silence_time + trailing
+                return False, f"anullsrc=r={sample_rate_out}:cl=mono,atrim=duration={duration:.3f}[a{i}]"
             else:
-                silence = AudioSegment.silent(duration=(max(lo-lt,0)*1000))
-                audio_with_silence = audio + silence
-                audio_with_silence.export(output_file, format="wav")
-            
-            print("#######diff######: ",lo-lt)
-            print("lo: ", lo)
-            print("lt: ", lt)
+                delay_ms = int(previous_silence_time*1000)
+                pad = max(lo-lt, 0) + trailing
+                return True, f"[{input_index}:a]adelay={delay_ms}:all=1,apad=pad_dur={pad:.3f}[a{i}]"
+
+        # Runtime-generate one ffmpeg filter graph specialized to this video's
+        # segment timings: every stretch, leading silence and trailing pad runs
+        # in a single ffmpeg process instead of several subprocess/pydub hops
+        # and intermediate wav writes per chunk
+        if synthesized:
+            command = ["ffmpeg", "-nostdin", "-y"]
+            filters = []
+            input_index = 0
+            for i in synthesized:
+                uses_input, chain = chunk_filter(i, input_index)
+                filters.append(chain)
+                if uses_input:
+                    command += ["-i", f"audio_chunks/{i}.wav"]
+                    input_index += 1
+
+            command += ["-filter_complex", ";".join(filters)]
+            for i in synthesized:
+                command += ["-map", f"[a{i}]", f"su_audio_chunks/{i}.wav"]
+
+            process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            if process.returncode != 0:
+                print(f"Fused ffmpeg filter graph failed, falling back to per-chunk runs: {process.stderr}")
+                for i in synthesized:
+                    uses_input, chain = chunk_filter(i, 0)
+                    fallback = ["ffmpeg", "-nostdin", "-y"]
+                    if uses_input:
+                        fallback += ["-i", f"audio_chunks/{i}.wav"]
+                    fallback += ["-filter_complex", chain, "-map", f"[a{i}]", f"su_audio_chunks/{i}.wav"]
+                    subprocess.run(fallback, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
             
         
        
         
-        # Get all the audio files from the folder
-        audio_files = [f for f in os.listdir("su_audio_chunks") if f.endswith(('.mp3', '.wav', '.ogg'))]
-        
-        # Sort files to concatenate them in order, if necessary
-        audio_files.sort(key=lambda x: int(x.split('.')[0]))  # Modify sorting logic if needed (e.g., based on filenames)
-        
-        # Loop through and concatenate each audio file
-        for audio_file in audio_files:
-            file_path = os.path.join("su_audio_chunks", audio_file)
-            audio_segment = AudioSegment.from_file(file_path)
-            combined += audio_segment  # Append audio to the combined segment
-        
-        
-        audio = AudioSegment.from_file(self.Video_path)
-        total_length = len(audio) / 1000.0 
-        silence = AudioSegment.silent(duration=abs(total_length - records[-1][3])*1000)
-        combined += silence
+        # The producer loop writes su_audio_chunks/{i}.wav for i in order, so
+        # enumerate the indices directly instead of listing, filtering and
+        # re-parsing filenames (which also guards against stray files)
+        chunk_samples = []
+        sr = sample_rate_out
+        for i in range(len(records)):
+            file_path = f"su_audio_chunks/{i}.wav"
+            if not os.path.exists(file_path):
+                continue
+            sr, samples = wav_read(file_path)
+            if samples.ndim > 1:
+                samples = samples[:, 0]
+            chunk_samples.append(samples.astype(np.int16))
+
+        # The original length is known from the waveform decoded at startup
+        total_length = waveform_44k.shape[1] / 44100
+        lead = int(leading_silence * sr)
+        tail = int(abs(total_length - records[-1][3]) * sr)
+
+        output_samples = np.zeros(lead + sum(len(chunk) for chunk in chunk_samples) + tail, dtype=np.int16)
+        offset = lead
+        for chunk in chunk_samples:
+            output_samples[offset:offset+len(chunk)] = chunk
+            offset += len(chunk)
+
         # Export the combined audio to the output file
-        combined.export("audio/output.wav", format="wav")
+        wavfile.write("audio/output.wav", sr, output_samples)
         
 
 
         
 
 
-        # Initialize Spleeter with the 2stems model (vocals + accompaniment)
-        separator = Separator()
-
-        # Load a model
-        separator.load_model(model_filename='2_HP-UVR.pth')
-        output_file_paths = separator.separate(self.Video_path)[0]
+        # Collect the source separation that ran alongside transcription
+        separation_thread.join()
+        output_file_paths = separation_result['path']
 
       
         
@@ -643,8 +873,9 @@ class VideoDubbing:
         
         # Video and Audio Overlay
         
-        command = f"ffmpeg -i '{self.Video_path}' -i audio/combined_audio.wav -c:v copy -map 0:v:0 -map 1:a:0 -shortest output_video.mp4"
-        subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        command = ["ffmpeg", "-nostdin", "-y", "-i", self.Video_path, "-i", "audio/combined_audio.wav",
+                   "-c:v", "copy", "-map", "0:v:0", "-map", "1:a:0", "-shortest", "output_video.mp4"]
+        subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         
         shutil.move(output_file_paths, "audio/")
         # os.system('pip install -r requirements.txt > /dev/null 2>&1')
@@ -658,15 +889,16 @@ class VideoDubbing:
             enhanced = enhance(model, df_state, audio)
             # Save for listening
             save_audio("audio/enhanced.wav", enhanced, df_state.sr())"""
-            command = f"ffmpeg -i '{self.Video_path}' -i audio/output.wav -c:v copy -map 0:v:0 -map 1:a:0 -shortest denoised_video.mp4"
-            subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            command = ["ffmpeg", "-nostdin", "-y", "-i", self.Video_path, "-i", "audio/output.wav",
+                       "-c:v", "copy", "-map", "0:v:0", "-map", "1:a:0", "-shortest", "denoised_video.mp4"]
+            subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         if self.LipSync and self.Voice_denoising:
             os.system("pip install librosa==0.9.1 > /dev/null 2>&1")
-            os.system("cd Wav2Lip && python inference.py --checkpoint_path 'wav2lip_gan.pth' --face '../denoised_video.mp4' --audio '../audio/output.wav' --face_det_batch_size 1 --wav2lip_batch_size 1")
+            os.system("cd Wav2Lip && python inference.py --checkpoint_path 'wav2lip_gan.pth' --face '../denoised_video.mp4' --audio '../audio/output.wav' --face_det_batch_size 1 --wav2lip_batch_size 16")
             
         if self.LipSync and not self.Voice_denoising:
             os.system("pip install librosa==0.9.1 > /dev/null 2>&1")
-            os.system("cd Wav2Lip && python inference.py --checkpoint_path 'wav2lip_gan.pth' --face '../output_video.mp4' --audio '../audio/combined_audio.wav' --face_det_batch_size 1 --wav2lip_batch_size 1")
+            os.system("cd Wav2Lip && python inference.py --checkpoint_path 'wav2lip_gan.pth' --face '../output_video.mp4' --audio '../audio/combined_audio.wav' --face_det_batch_size 1 --wav2lip_batch_size 16")
 
 			 
         if  self.LipSync and self.Voice_denoising:
@@ -719,7 +951,8 @@ language_mapping = {
 
 def process_video(video, source_language, target_language, use_wav2lip, whisper_model, bg_sound, use_google_tts, translation_provider):
     try:
-        os.system("rm video_path.mp4")
+        if os.path.exists("video_path.mp4"):
+            os.remove("video_path.mp4")
         video_path = None
         if "youtube.com" in video:
             os.system(f"yt-dlp -f best -o 'video_path.mp4' --recode-video mp4 {video}")
@@ -825,5 +1058,12 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
   
 
 print("Launching Gradio interface...")
-demo.queue()
+# Warm the heavyweight singletons so the first request only pays inference
+get_translation_service()
+EnhancedTTS(use_google_tts=False)  # populates the shared XTTS model cache
+# Jobs must run one at a time: VideoDubbing works in shared scratch
+# directories (audio/, results/, audio_chunks/, ...) that concurrent runs
+# would wipe from under each other. The bounded queue still lets requests
+# wait their turn instead of being dropped.
+demo.queue(max_size=32)
 demo.launch(share=True)
\ No newline at end of file
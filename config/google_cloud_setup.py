@@ -3,6 +3,17 @@ import json
 import logging
 from pathlib import Path
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Validation results keyed by (path, mtime); discovery result for the process
+_VALIDATION_CACHE = {}
+_DISCOVERED_CREDS_PATH = None
+_DISCOVERY_DONE = False
+
 def setup_google_cloud_credentials():
     """
     Setup Google Cloud credentials for TTS
@@ -15,7 +26,18 @@ def setup_google_cloud_credentials():
     Returns:
         str: Path to credentials file or None if not found
     """
-    
+    global _DISCOVERED_CREDS_PATH, _DISCOVERY_DONE
+
+    # The search result can't change mid-run, so discover once per process
+    if _DISCOVERY_DONE:
+        return _DISCOVERED_CREDS_PATH
+
+    _DISCOVERY_DONE = True
+    _DISCOVERED_CREDS_PATH = _discover_credentials()
+    return _DISCOVERED_CREDS_PATH
+
+def _discover_credentials():
+    """Walk the credential search order and return the first existing path"""
     # Check environment variable
     creds_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
     if creds_path and os.path.exists(creds_path):
@@ -23,9 +45,10 @@ def setup_google_cloud_credentials():
         return creds_path
     
     # Check .env file
-    from dotenv import load_dotenv
-    load_dotenv()
-    
+    from tools.env import load_env_once
+    load_env_once()
+
+
     creds_path = os.getenv('GOOGLE_CLOUD_CREDENTIALS_PATH')
     if creds_path and os.path.exists(creds_path):
         logging.info(f"Using Google Cloud credentials from .env file: {creds_path}")
@@ -58,26 +81,33 @@ def validate_google_cloud_credentials(credentials_path):
     """
     if not credentials_path or not os.path.exists(credentials_path):
         return False
-    
+
     try:
-        with open(credentials_path, 'r') as f:
-            creds = json.load(f)
-        
+        cache_key = (credentials_path, os.path.getmtime(credentials_path))
+        if cache_key in _VALIDATION_CACHE:
+            return _VALIDATION_CACHE[cache_key]
+
+        creds = _loads(Path(credentials_path).read_bytes())
+
         required_fields = ['type', 'project_id', 'private_key_id', 'private_key', 'client_email']
-        
+
+        valid = True
         for field in required_fields:
             if field not in creds:
                 logging.error(f"Missing required field in credentials: {field}")
-                return False
-        
-        if creds.get('type') != 'service_account':
+                valid = False
+                break
+
+        if valid and creds.get('type') != 'service_account':
             logging.error("Credentials file is not for a service account")
-            return False
-        
-        logging.info("Google Cloud credentials validated successfully")
-        return True
-        
-    except json.JSONDecodeError:
+            valid = False
+
+        if valid:
+            logging.info("Google Cloud credentials validated successfully")
+        _VALIDATION_CACHE[cache_key] = valid
+        return valid
+
+    except ValueError:
         logging.error("Invalid JSON in credentials file")
         return False
     except Exception as e:
@@ -17,13 +17,13 @@ install_if_not_installed('protobuf', 'pip install protobuf==3.19.6')
 install_if_not_installed('spacy', 'pip install spacy==3.8.2')
 install_if_not_installed('TTS', 'pip install --no-deps TTS==0.21.0')
 install_if_not_installed('packaging', 'pip install packaging==20.9')
-install_if_not_installed('openai-whisper', 'pip install openai-whisper==20240930')
+install_if_not_installed('faster_whisper', 'pip install faster-whisper==1.1.0')
 install_if_not_installed('deepface', 'pip install deepface==0.0.93')
 os.system('pip install numpy==1.26.4 > /dev/null 2>&1')
 
 from pyannote.audio import Pipeline
 from audio_separator.separator import Separator
-import whisper
+from faster_whisper import WhisperModel, BatchedInferencePipeline
 from transformers import MarianMTModel, MarianTokenizer
 from TTS.api import TTS
 from pydub import AudioSegment
@@ -248,18 +248,23 @@ class VideoDubbing:
         
         most_occured_speaker= max(list(speakers_rolls.values()),key=list(speakers_rolls.values()).count)
         
-        model = whisper.load_model(self.whisper_model, device=device)
-        transcript = model.transcribe(
+        model = WhisperModel(self.whisper_model, device=device.type,
+                             compute_type="int8_float16" if device.type == "cuda" else "int8")
+        batched_model = BatchedInferencePipeline(model=model)
+        # Batched VAD chunks run through the GPU together instead of
+        # sequential 30 s windows
+        segments, info = batched_model.transcribe(
+            self.Video_path,
+            batch_size=16,
             word_timestamps=True,
-            audio=self.Video_path,
           )
 			 
         time_stamped = []
         full_text = []
-        for segment in transcript['segments']:
-            for word in segment['words']:
-                time_stamped.append([word['word'],word['start'],word['end']])
-                full_text.append(word['word'])
+        for segment in segments:
+            for word in segment.words:
+                time_stamped.append([word.word, word.start, word.end])
+                full_text.append(word.word)
         full_text = "".join(full_text)
        
         # Decompose Long Sentences
@@ -1,9 +1,49 @@
 import os
 import logging
-from TTS.api import TTS
+import contextlib
+import numpy as np
 from pydub import AudioSegment
 from .google_tts import GoogleTTS, get_google_language_code
 
+_HAS_CUDA = None
+_COQUI_MODELS = {}
+
+
+def _cuda_available():
+    """Cached torch CUDA probe, so instances don't fork nvidia-smi."""
+    global _HAS_CUDA
+    if _HAS_CUDA is None:
+        import torch
+        _HAS_CUDA = torch.cuda.is_available()
+    return _HAS_CUDA
+
+
+def _autocast_ctx():
+    """FP16 autocast context on GPU, a no-op on CPU"""
+    if _cuda_available():
+        import torch
+        return torch.autocast(device_type="cuda", dtype=torch.float16)
+    return contextlib.nullcontext()
+
+
+def _optimize_coqui_model(tts):
+    """Lower XTTS precision once after loading: FP16 on GPU, int8 on CPU"""
+    import torch
+    try:
+        synthesizer = tts.synthesizer
+        if _cuda_available():
+            synthesizer.tts_model.half()
+            if getattr(synthesizer, 'vocoder_model', None) is not None:
+                synthesizer.vocoder_model.half()
+        else:
+            synthesizer.tts_model = torch.quantization.quantize_dynamic(
+                synthesizer.tts_model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+    except Exception as e:
+        logging.warning(f"Could not lower XTTS precision: {e}")
+    return tts
+
+
 class EnhancedTTS:
     def __init__(self, use_google_tts=False, google_credentials_path=None):
         """
@@ -16,6 +56,9 @@ class EnhancedTTS:
         self.use_google_tts = use_google_tts
         self.google_tts = None
         self.coqui_tts = None
+        self._latent_cache = {}
+        self._google_lang = None
+        self._google_lang_key = None
         
         # Initialize Google TTS if requested
         if use_google_tts:
@@ -27,9 +70,16 @@ class EnhancedTTS:
         # Initialize Coqui TTS as fallback or primary
         if not self.use_google_tts or not self.google_tts or not self.google_tts.available:
             try:
+                # Imported here so merely loading this module doesn't pull in
+                # torch and the whole TTS stack before the UI is up
+                from TTS.api import TTS
                 os.environ["COQUI_TOS_AGREED"] = "1"
-                device = "cuda" if os.system("nvidia-smi") == 0 else "cpu"
-                self.coqui_tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2", gpu=(device == "cuda"))
+                model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
+                if model_name not in _COQUI_MODELS:
+                    _COQUI_MODELS[model_name] = _optimize_coqui_model(
+                        TTS(model_name, gpu=_cuda_available())
+                    )
+                self.coqui_tts = _COQUI_MODELS[model_name]
                 logging.info("Coqui TTS initialized successfully")
             except Exception as e:
                 logging.error(f"Failed to initialize Coqui TTS: {e}")
@@ -66,7 +116,11 @@ class EnhancedTTS:
     
     def _synthesize_with_google(self, text, language_code, speed, output_path, voice_name, gender):
         """Synthesize using Google Cloud TTS"""
-        google_lang_code = get_google_language_code(language_code)
+        # Most runs dub into a single language, so resolve the code once
+        if self._google_lang_key != language_code:
+            self._google_lang_key = language_code
+            self._google_lang = get_google_language_code(language_code)
+        google_lang_code = self._google_lang
         
         if output_path:
             success = self.google_tts.synthesize_to_file(
@@ -91,27 +145,29 @@ class EnhancedTTS:
         """Synthesize using Coqui TTS"""
         try:
             if output_path:
-                self.coqui_tts.tts_to_file(
-                    text=text,
-                    file_path=output_path,
-                    speaker_wav=speaker_wav,
-                    language=language_code,
-                    emotion=emotion,
-                    speed=speed
-                )
-                return output_path
-            else:
-                # For in-memory synthesis, we need to use a temporary file
-                import tempfile
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+                with _autocast_ctx():
                     self.coqui_tts.tts_to_file(
                         text=text,
-                        file_path=tmp_file.name,
+                        file_path=output_path,
                         speaker_wav=speaker_wav,
                         language=language_code,
                         emotion=emotion,
                         speed=speed
                     )
+                return output_path
+            else:
+                # For in-memory synthesis, we need to use a temporary file
+                import tempfile
+                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+                    with _autocast_ctx():
+                        self.coqui_tts.tts_to_file(
+                            text=text,
+                            file_path=tmp_file.name,
+                            speaker_wav=speaker_wav,
+                            language=language_code,
+                            emotion=emotion,
+                            speed=speed
+                        )
                     audio_segment = AudioSegment.from_wav(tmp_file.name)
                     os.unlink(tmp_file.name)  # Clean up temp file
                     return audio_segment
@@ -119,6 +175,84 @@ class EnhancedTTS:
             logging.error(f"Error with Coqui TTS synthesis: {e}")
             return None
     
+    def synthesize_batch(self, texts, speaker_wavs, language_code, speed=1.0):
+        """
+        Synthesize several sentences with Coqui XTTS in one pass
+
+        Computes the conditioning latents once per unique speaker reference
+        and calls the model's inference API directly, so the per-sentence
+        tempfile write/read round-trip is skipped entirely.
+
+        Args:
+            texts: List of sentences to synthesize
+            speaker_wavs: List of speaker reference paths, one per sentence
+            language_code: Language code shared by all sentences
+            speed: Speaking speed passed through to the model
+
+        Returns:
+            List of per-sentence AudioSegments, or None on failure
+        """
+        if not self.coqui_tts:
+            logging.error("Coqui TTS not available for batch synthesis")
+            return None
+        try:
+            model = self.coqui_tts.synthesizer.tts_model
+            results = []
+            for text, speaker_wav in zip(texts, speaker_wavs):
+                with _autocast_ctx():
+                    # The latents must also run under autocast: the encoders
+                    # are FP16 on GPU and choke on FP32 reference audio
+                    if speaker_wav not in self._latent_cache:
+                        self._latent_cache[speaker_wav] = model.get_conditioning_latents(
+                            audio_path=speaker_wav
+                        )
+                    gpt_cond_latent, speaker_embedding = self._latent_cache[speaker_wav]
+                    out = model.inference(text, language_code, gpt_cond_latent,
+                                          speaker_embedding, speed=speed)
+                samples = (np.clip(np.asarray(out["wav"]), -1.0, 1.0) * 32767).astype(np.int16)
+                results.append(AudioSegment(
+                    data=samples.tobytes(), frame_rate=24000, sample_width=2, channels=1
+                ))
+            return results
+        except Exception as e:
+            logging.error(f"Error with Coqui TTS batch synthesis: {e}")
+            return None
+
+    def synthesize_stream(self, text, language_code, speaker_wav, stream_chunk_size=20):
+        """
+        Yield XTTS audio chunks as they are generated
+
+        Uses the model's inference_stream API so downstream stages can start
+        consuming partial audio instead of waiting for the full utterance.
+        Reuses the cached conditioning latents from synthesize_batch.
+
+        Args:
+            text: Sentence to synthesize
+            language_code: Language code
+            speaker_wav: Path to the speaker reference audio
+            stream_chunk_size: Number of GPT tokens per emitted chunk
+
+        Yields:
+            Numpy float waveform chunks at 24 kHz
+        """
+        if not self.coqui_tts:
+            logging.error("Coqui TTS not available for streaming synthesis")
+            return
+
+        model = self.coqui_tts.synthesizer.tts_model
+        with _autocast_ctx():
+            # Latents under autocast too — the encoders are FP16 on GPU
+            if speaker_wav not in self._latent_cache:
+                self._latent_cache[speaker_wav] = model.get_conditioning_latents(
+                    audio_path=speaker_wav
+                )
+            gpt_cond_latent, speaker_embedding = self._latent_cache[speaker_wav]
+
+            for chunk in model.inference_stream(text, language_code, gpt_cond_latent,
+                                                speaker_embedding,
+                                                stream_chunk_size=stream_chunk_size):
+                yield chunk.float().cpu().numpy()
+
     def get_available_voices(self, language_code):
         """Get available voices for the current TTS system"""
         if self.use_google_tts and self.google_tts and self.google_tts.available:
@@ -0,0 +1,11 @@
+from dotenv import load_dotenv
+
+_ENV_LOADED = False
+
+
+def load_env_once():
+    """Parse the .env file once per process; repeat callers return instantly."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        load_dotenv()
+        _ENV_LOADED = True
@@ -1,10 +1,24 @@
 import os
 import io
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import texttospeech
+from google.api_core import exceptions as gcloud_exceptions
+from google.api_core import retry as gcloud_retry
 from pydub import AudioSegment
 import tempfile
 import logging
 
+# Back off and retry when the API throttles or hiccups under concurrent load
+_TTS_RETRY = gcloud_retry.Retry(
+    predicate=gcloud_retry.if_exception_type(
+        gcloud_exceptions.ResourceExhausted,
+        gcloud_exceptions.ServiceUnavailable
+    ),
+    initial=1.0, maximum=10.0, multiplier=2.0, deadline=60.0
+)
+
 class GoogleTTS:
     def __init__(self, credentials_path=None):
         """
@@ -16,7 +30,11 @@ class GoogleTTS:
         """
         if credentials_path:
             os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-        
+
+        self._voices_cache = {}
+        self._async_client = None
+
+
         try:
             self.client = texttospeech.TextToSpeechClient()
             self.available = True
@@ -37,11 +55,15 @@ class GoogleTTS:
         """
         if not self.available:
             return []
-        
+
+        # The voice list rarely changes, so one RPC per language is plenty
+        if language_code in self._voices_cache:
+            return self._voices_cache[language_code]
+
         try:
             voices = self.client.list_voices()
             available_voices = []
-            
+
             for voice in voices.voices:
                 if language_code in voice.language_codes:
                     available_voices.append({
@@ -49,13 +71,99 @@ class GoogleTTS:
                         'gender': voice.ssml_gender.name,
                         'language_codes': list(voice.language_codes)
                     })
-            
+
+            self._voices_cache[language_code] = available_voices
             return available_voices
         except Exception as e:
             logging.error(f"Error getting available voices: {e}")
             return []
     
-    def synthesize_speech(self, text, language_code="en-US", voice_name=None, 
+    def _build_request(self, text, language_code, voice_name, gender, speaking_rate, pitch):
+        """Assemble the input, voice and audio config for one synthesis RPC"""
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+
+        # Configure voice parameters
+        voice_params = {
+            'language_code': language_code
+        }
+
+        if voice_name:
+            voice_params['name'] = voice_name
+        elif gender:
+            if gender.upper() == 'MALE':
+                voice_params['ssml_gender'] = texttospeech.SsmlVoiceGender.MALE
+            elif gender.upper() == 'FEMALE':
+                voice_params['ssml_gender'] = texttospeech.SsmlVoiceGender.FEMALE
+            else:
+                voice_params['ssml_gender'] = texttospeech.SsmlVoiceGender.NEUTRAL
+
+        voice = texttospeech.VoiceSelectionParams(**voice_params)
+
+        # Configure audio output as raw PCM so no MP3 codec is involved
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
+            sample_rate_hertz=24000,
+            speaking_rate=speaking_rate,
+            pitch=pitch
+        )
+
+        return synthesis_input, voice, audio_config
+
+    def _get_async_client(self):
+        """Lazily create the gRPC async client backing the *_async methods"""
+        if self._async_client is None:
+            self._async_client = texttospeech.TextToSpeechAsyncClient()
+        return self._async_client
+
+    async def synthesize_speech_async(self, text, language_code="en-US", voice_name=None,
+                                      gender=None, speaking_rate=1.0, pitch=0.0):
+        """
+        Async counterpart of synthesize_speech
+
+        Lets an asyncio pipeline issue the RPC for the next sentence while
+        the previous one is still being post-processed. Sync callers keep
+        using synthesize_speech unchanged.
+
+        Returns:
+            AudioSegment object or None if failed
+        """
+        if not self.available:
+            logging.error("Google Cloud TTS not available")
+            return None
+
+        try:
+            synthesis_input, voice, audio_config = self._build_request(
+                text, language_code, voice_name, gender, speaking_rate, pitch
+            )
+
+            response = await self._get_async_client().synthesize_speech(
+                input=synthesis_input,
+                voice=voice,
+                audio_config=audio_config
+            )
+
+            return AudioSegment.from_wav(io.BytesIO(response.audio_content))
+
+        except Exception as e:
+            logging.error(f"Error synthesizing speech: {e}")
+            return None
+
+    async def synthesize_batch_async(self, items):
+        """
+        Synthesize many sentences with overlapped async RPCs
+
+        Args:
+            items: List of (text, voice_name, language_code) tuples
+
+        Returns:
+            List of AudioSegment objects (None entries where synthesis failed)
+        """
+        tasks = [self.synthesize_speech_async(text, language_code=language_code,
+                                              voice_name=voice_name)
+                 for text, voice_name, language_code in items]
+        return await asyncio.gather(*tasks)
+
+    def synthesize_speech(self, text, language_code="en-US", voice_name=None,
                          gender=None, speaking_rate=1.0, pitch=0.0):
         """
         Synthesize speech using Google Cloud TTS
@@ -71,51 +179,37 @@ class GoogleTTS:
         Returns:
             AudioSegment object or None if failed
         """
+        audio_content = self._synthesize_raw(
+            text, language_code, voice_name, gender, speaking_rate, pitch
+        )
+        if audio_content is None:
+            return None
+
+        # LINEAR16 responses arrive as a complete WAV container, so this
+        # is a plain header parse rather than an ffmpeg MP3 decode
+        return AudioSegment.from_wav(io.BytesIO(audio_content))
+
+    def _synthesize_raw(self, text, language_code="en-US", voice_name=None,
+                        gender=None, speaking_rate=1.0, pitch=0.0):
+        """Run one synthesis RPC and return the WAV bytes, or None on failure"""
         if not self.available:
             logging.error("Google Cloud TTS not available")
             return None
-        
+
         try:
-            # Set up the text input
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-            
-            # Configure voice parameters
-            voice_params = {
-                'language_code': language_code
-            }
-            
-            if voice_name:
-                voice_params['name'] = voice_name
-            elif gender:
-                if gender.upper() == 'MALE':
-                    voice_params['ssml_gender'] = texttospeech.SsmlVoiceGender.MALE
-                elif gender.upper() == 'FEMALE':
-                    voice_params['ssml_gender'] = texttospeech.SsmlVoiceGender.FEMALE
-                else:
-                    voice_params['ssml_gender'] = texttospeech.SsmlVoiceGender.NEUTRAL
-            
-            voice = texttospeech.VoiceSelectionParams(**voice_params)
-            
-            # Configure audio output
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=speaking_rate,
-                pitch=pitch
+            synthesis_input, voice, audio_config = self._build_request(
+                text, language_code, voice_name, gender, speaking_rate, pitch
             )
-            
-            # Perform the text-to-speech request
+
             response = self.client.synthesize_speech(
                 input=synthesis_input,
                 voice=voice,
-                audio_config=audio_config
+                audio_config=audio_config,
+                retry=_TTS_RETRY
             )
-            
-            # Convert to AudioSegment
-            audio_content = io.BytesIO(response.audio_content)
-            audio_segment = AudioSegment.from_mp3(audio_content)
-            
-            return audio_segment
-            
+
+            return response.audio_content
+
         except Exception as e:
             logging.error(f"Error synthesizing speech: {e}")
             return None
@@ -137,20 +231,50 @@ class GoogleTTS:
         Returns:
             True if successful, False otherwise
         """
-        audio_segment = self.synthesize_speech(
+        audio_content = self._synthesize_raw(
             text, language_code, voice_name, gender, speaking_rate, pitch
         )
-        
-        if audio_segment:
+
+        if audio_content:
             try:
-                audio_segment.export(output_path, format="wav")
+                # The LINEAR16 response already carries its RIFF header, so
+                # the bytes go straight to disk — no pydub export subprocess
+                with open(output_path, 'wb') as f:
+                    f.write(audio_content)
                 return True
             except Exception as e:
                 logging.error(f"Error saving audio file: {e}")
                 return False
-        
+
         return False
 
+    def synthesize_batch(self, items, max_workers=16):
+        """
+        Synthesize many sentences concurrently and save each to its own file
+
+        The underlying TextToSpeechClient is thread-safe, so one client is
+        shared across the pool and each worker performs a single RPC.
+
+        Args:
+            items: List of (text, voice_name, language_code, output_path) tuples
+            max_workers: Size of the thread pool
+
+        Returns:
+            List of booleans in input order, True where synthesis succeeded
+        """
+        if not self.available:
+            logging.error("Google Cloud TTS not available")
+            return [False] * len(items)
+
+        def synthesize_one(item):
+            text, voice_name, language_code, output_path = item
+            return self.synthesize_to_file(
+                text, output_path, language_code=language_code, voice_name=voice_name
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(synthesize_one, items))
+
 # Language code mapping for Google Cloud TTS
 GOOGLE_TTS_LANGUAGE_MAPPING = {
     'en': 'en-US',
@@ -170,14 +294,17 @@ GOOGLE_TTS_LANGUAGE_MAPPING = {
     'hu': 'hu-HU'
 }
 
+# defaultdict so the per-sentence lookup skips the .get default handling
+_GOOGLE_LANG = defaultdict(lambda: 'en-US', GOOGLE_TTS_LANGUAGE_MAPPING)
+
 def get_google_language_code(vidubb_language_code):
     """
     Convert ViDubb language code to Google Cloud TTS language code
-    
+
     Args:
         vidubb_language_code: Language code used in ViDubb
-        
+
     Returns:
         Google Cloud TTS compatible language code
     """
-    return GOOGLE_TTS_LANGUAGE_MAPPING.get(vidubb_language_code, 'en-US')
\ No newline at end of file
+    return _GOOGLE_LANG[vidubb_language_code]
\ No newline at end of file
@@ -1,10 +1,39 @@
 import os
 import re
+import atexit
+import asyncio
 import logging
 from groq import Groq
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
 import json
-from typing import Optional, Dict, Any
+import numpy as np
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Compiled once; translate_with_groq matches this on every response
+_TRANSLATION_RE = re.compile(r'\[\[sentence translation: (.*?)\]\]', re.DOTALL)
+
+# Terse shared instructions: the old per-sentence prompts carried ~120 tokens
+# of boilerplate each, billed and prefilled on every call
+SYS_PROMPT = ("You are a professional translator for video dubbing. "
+              "Reply with only the translation of the given sentence, "
+              "concise and natural, using the surrounding lines as context.")
+
+
+def _user_prompt(sentence: str, before_context: str, after_context: str,
+                 target_language: str) -> str:
+    """Build the minimal per-sentence user message"""
+    return (f"Prev: {before_context}\n"
+            f"Sent: {sentence}\n"
+            f"Next: {after_context}\n"
+            f"Target: {target_language}")
 
 class TranslationService:
     def __init__(self, groq_api_key: str = None, openrouter_api_key: str = None):
@@ -18,6 +47,35 @@ class TranslationService:
         self.groq_client = None
         self.openrouter_api_key = openrouter_api_key
         self.openrouter_base_url = "https://openrouter.ai/api/v1"
+        self._async_client = None
+        self._semaphore = None
+        self._client_loop = None
+
+        # Shared session so OpenRouter calls reuse one TLS connection
+        # (keep-alive) instead of handshaking per request
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 502, 503])
+        ))
+
+        # Two-tier translation cache: exact matches persisted between runs,
+        # plus an in-memory semantic tier for near-duplicate sentences. The
+        # file lives in the repo root next to the .translation_cache shelve —
+        # results/ is wiped at the start of every run
+        self._cache_path = ".translation_api_cache.json"
+        self._exact_cache = {}
+        self._emb_cache = []
+        self._embedder = None
+        self._cache_dirty = False
+        try:
+            with open(self._cache_path) as f:
+                self._exact_cache = json.load(f)
+        except (OSError, ValueError):
+            pass
+        atexit.register(self._persist_cache)
         
         # Initialize Groq client
         if groq_api_key:
@@ -27,13 +85,9 @@ class TranslationService:
             except Exception as e:
                 logging.error(f"Failed to initialize Groq client: {e}")
         
-        # Validate OpenRouter API key
-        if openrouter_api_key:
-            if self._validate_openrouter_key():
-                logging.info("OpenRouter API key validated successfully")
-            else:
-                logging.warning("OpenRouter API key validation failed")
-                self.openrouter_api_key = None
+        # OpenRouter key validation is deferred to the first translation call
+        # so constructing the service doesn't block on a network round trip
+        self._key_validated = None
     
     def _validate_openrouter_key(self) -> bool:
         """Validate OpenRouter API key"""
@@ -42,7 +96,7 @@ class TranslationService:
                 "Authorization": f"Bearer {self.openrouter_api_key}",
                 "Content-Type": "application/json"
             }
-            response = requests.get(f"{self.openrouter_base_url}/models", headers=headers, timeout=10)
+            response = self._session.get(f"{self.openrouter_base_url}/models", headers=headers, timeout=10)
             return response.status_code == 200
         except Exception as e:
             logging.error(f"OpenRouter key validation error: {e}")
@@ -69,37 +123,24 @@ class TranslationService:
         try:
             chat_completion = self.groq_client.chat.completions.create(
                 messages=[
-                    {
-                        "role": "user",
-                        "content": f"""
-                        Role: You are a professional translator who translates concisely in short sentences while preserving meaning and context.
-                        
-                        Instruction:
-                        Translate the given sentence into {target_language}. Consider the context provided by the previous and next sentences.
-                        
-                        Previous context: {before_context}
-                        Sentence to translate: {sentence}
-                        Next context: {after_context}
-                        
-                        Output format:
-                        [[sentence translation: <your translation>]]
-                        """,
-                    }
+                    {"role": "system", "content": SYS_PROMPT},
+                    {"role": "user", "content": _user_prompt(sentence, before_context,
+                                                             after_context, target_language)},
                 ],
                 model=model,
                 temperature=0.3,
                 max_tokens=500
             )
-            
-            # Extract translation using regex
-            pattern = r'\[\[sentence translation: (.*?)\]\]'
-            match = re.search(pattern, chat_completion.choices[0].message.content, re.DOTALL)
-            
+
+            # The whole response is the translation; the marker pattern is
+            # only checked in case a model still wraps its output
+            content = chat_completion.choices[0].message.content
+            match = _TRANSLATION_RE.search(content)
+
             if match:
                 return match.group(1).strip()
             else:
-                # Fallback: return the full response if pattern doesn't match
-                return chat_completion.choices[0].message.content.strip()
+                return content.strip()
                 
         except Exception as e:
             logging.error(f"Groq translation error: {e}")
@@ -122,42 +163,21 @@ class TranslationService:
         """
         if not self.openrouter_api_key:
             return None
-        
+
+        if self._key_validated is None:
+            self._key_validated = self._validate_openrouter_key()
+            if self._key_validated:
+                logging.info("OpenRouter API key validated successfully")
+            else:
+                logging.warning("OpenRouter API key validation failed")
+        if not self._key_validated:
+            return None
+
         try:
-            headers = {
-                "Authorization": f"Bearer {self.openrouter_api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://vidubb.ai",
-                "X-Title": "ViDubb Translation Service"
-            }
-            
-            data = {
-                "model": model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": f"""
-                        Role: You are a professional translator specializing in video dubbing and subtitle translation.
-                        
-                        Task: Translate the given sentence into {target_language} while maintaining:
-                        - Natural flow and timing suitable for video dubbing
-                        - Emotional tone and context
-                        - Cultural appropriateness
-                        
-                        Context:
-                        Previous: {before_context}
-                        Current: {sentence}
-                        Next: {after_context}
-                        
-                        Provide only the translation without explanations.
-                        """
-                    }
-                ],
-                "temperature": 0.3,
-                "max_tokens": 500
-            }
-            
-            response = requests.post(
+            headers, data = self._openrouter_request(sentence, before_context, after_context,
+                                                     target_language, model)
+
+            response = self._session.post(
                 f"{self.openrouter_base_url}/chat/completions",
                 headers=headers,
                 json=data,
@@ -174,7 +194,191 @@ class TranslationService:
         except Exception as e:
             logging.error(f"OpenRouter translation error: {e}")
             return None
-    
+
+    def _get_embedder(self):
+        """Lazily load the sentence-transformers model backing the semantic tier"""
+        if self._embedder is None:
+            if SentenceTransformer is None:
+                self._embedder = False
+            else:
+                try:
+                    self._embedder = SentenceTransformer('all-MiniLM-L6-v2')
+                except Exception as e:
+                    logging.warning(f"Semantic translation cache disabled: {e}")
+                    self._embedder = False
+        return self._embedder or None
+
+    def _cache_lookup(self, sentence: str, target_language: str, provider: str) -> Optional[str]:
+        """Return a cached translation: exact match first, then cosine >= 0.95"""
+        key = f"{provider}|{target_language}|{sentence}"
+        if key in self._exact_cache:
+            return self._exact_cache[key]
+
+        embedder = self._get_embedder()
+        if embedder and self._emb_cache:
+            entries = [entry for entry in self._emb_cache
+                       if entry[1] == target_language and entry[2] == provider]
+            if entries:
+                vec = embedder.encode(sentence, normalize_embeddings=True)
+                scores = np.stack([entry[0] for entry in entries]) @ vec
+                best = int(np.argmax(scores))
+                if scores[best] >= 0.95:
+                    return entries[best][3]
+        return None
+
+    def _cache_store(self, sentence: str, target_language: str, provider: str, translation: str):
+        """Record a fresh translation in both in-memory cache tiers"""
+        self._exact_cache[f"{provider}|{target_language}|{sentence}"] = translation
+        self._cache_dirty = True
+
+        embedder = self._get_embedder()
+        if embedder:
+            vec = embedder.encode(sentence, normalize_embeddings=True)
+            self._emb_cache.append((vec, target_language, provider, translation))
+
+    def _persist_cache(self):
+        """Write the exact tier to disk if it changed since the last save.
+
+        Called after each batch and at interpreter exit rather than per
+        store, so the hot path never rewrites the whole file per sentence.
+        """
+        if not self._cache_dirty:
+            return
+        try:
+            with open(self._cache_path, 'w') as f:
+                json.dump(self._exact_cache, f, ensure_ascii=False)
+            self._cache_dirty = False
+        except OSError as e:
+            logging.warning(f"Could not persist translation cache: {e}")
+
+    def _openrouter_request(self, sentence: str, before_context: str, after_context: str,
+                            target_language: str, model: str):
+        """Build the headers and JSON payload for an OpenRouter translation call"""
+        headers = {
+            "Authorization": f"Bearer {self.openrouter_api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://vidubb.ai",
+            "X-Title": "ViDubb Translation Service"
+        }
+
+        data = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": SYS_PROMPT},
+                {"role": "user", "content": _user_prompt(sentence, before_context,
+                                                         after_context, target_language)},
+            ],
+            "temperature": 0.3,
+            "max_tokens": 500
+        }
+
+        return headers, data
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP/2 client, rebuilt when the event loop changes
+
+        httpx clients and semaphores are bound to the loop they were created
+        on, and asyncio.run tears its loop down on return — reusing a client
+        from an earlier run raises on every request. Callers should still
+        await aclose() before their loop exits; if one didn't, the stale
+        client is dropped here and a fresh one is built on the current loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._client_loop is not loop:
+            if self._async_client is not None:
+                logging.warning("Async HTTP client outlived its event loop; recreating")
+            self._async_client = httpx.AsyncClient(http2=True, timeout=30)
+            self._semaphore = asyncio.Semaphore(8)
+            self._client_loop = loop
+        return self._async_client
+
+    async def translate_async(self, sentence: str, before_context: str = "", after_context: str = "",
+                              target_language: str = "English",
+                              model: str = "anthropic/claude-3.5-sonnet") -> Optional[str]:
+        """
+        Async counterpart of translate()
+
+        Issues the OpenRouter request on a shared HTTP/2 connection pool,
+        bounded by a semaphore so concurrent calls don't stampede the API,
+        and falls back to Groq in a worker thread if OpenRouter fails.
+
+        Args:
+            sentence: Text to translate
+            before_context: Previous sentence for context
+            after_context: Next sentence for context
+            target_language: Target language
+            model: OpenRouter model to use
+
+        Returns:
+            Translated text or None if all providers fail
+        """
+        cached = self._cache_lookup(sentence, target_language, "auto")
+        if cached is not None:
+            return cached
+
+        if self.openrouter_api_key and self._key_validated is not False:
+            try:
+                client = self._get_async_client()
+                headers, data = self._openrouter_request(sentence, before_context, after_context,
+                                                         target_language, model)
+                async with self._semaphore:
+                    response = await client.post(f"{self.openrouter_base_url}/chat/completions",
+                                                 headers=headers, json=data)
+                if response.status_code == 200:
+                    result = response.json()
+                    translation = result['choices'][0]['message']['content'].strip()
+                    self._cache_store(sentence, target_language, "auto", translation)
+                    return translation
+                if response.status_code == 401:
+                    # Bad key: remember it so later calls go straight to Groq
+                    self._key_validated = False
+                logging.error(f"OpenRouter API error: {response.status_code} - {response.text}")
+            except Exception as e:
+                logging.error(f"OpenRouter translation error: {e}")
+
+        if self.groq_client:
+            translation = await asyncio.to_thread(self.translate_with_groq, sentence, before_context,
+                                                  after_context, target_language)
+            if translation:
+                self._cache_store(sentence, target_language, "auto", translation)
+            return translation
+
+        logging.error("No translation providers available or all failed")
+        return None
+
+    async def translate_batch(self, segments: List[Tuple[str, str, str]],
+                              target_language: str = "English") -> List[Optional[str]]:
+        """
+        Translate many segments concurrently
+
+        Args:
+            segments: List of (sentence, before_context, after_context) tuples
+            target_language: Target language
+
+        Returns:
+            List of translations in the same order as the input segments
+        """
+        tasks = [self.translate_async(sentence, before_context, after_context, target_language)
+                 for sentence, before_context, after_context in segments]
+        results = await asyncio.gather(*tasks)
+        self._persist_cache()
+        return results
+
+    async def aclose(self):
+        """Close the shared async HTTP client"""
+        self._persist_cache()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._semaphore = None
+            self._client_loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
     def translate(self, sentence: str, before_context: str = "", after_context: str = "",
                  target_language: str = "English", provider: str = "auto") -> Optional[str]:
         """
@@ -190,22 +394,27 @@ class TranslationService:
         Returns:
             Translated text or None if all providers fail
         """
+        cached = self._cache_lookup(sentence, target_language, provider)
+        if cached is not None:
+            return cached
+
+        result = None
         if provider == "groq" and self.groq_client:
-            return self.translate_with_groq(sentence, before_context, after_context, target_language)
+            result = self.translate_with_groq(sentence, before_context, after_context, target_language)
         elif provider == "openrouter" and self.openrouter_api_key:
-            return self.translate_with_openrouter(sentence, before_context, after_context, target_language)
+            result = self.translate_with_openrouter(sentence, before_context, after_context, target_language)
         elif provider == "auto":
             # Try OpenRouter first (generally higher quality), then Groq
             if self.openrouter_api_key:
                 result = self.translate_with_openrouter(sentence, before_context, after_context, target_language)
-                if result:
-                    return result
-            
-            if self.groq_client:
+
+            if not result and self.groq_client:
                 result = self.translate_with_groq(sentence, before_context, after_context, target_language)
-                if result:
-                    return result
-        
+
+        if result:
+            self._cache_store(sentence, target_language, provider, result)
+            return result
+
         logging.error("No translation providers available or all failed")
         return None
     
@@ -239,9 +448,10 @@ def setup_translation_service() -> TranslationService:
     Returns:
         Configured TranslationService instance
     """
-    from dotenv import load_dotenv
-    load_dotenv()
-    
+    from tools.env import load_env_once
+    load_env_once()
+
+
     groq_api_key = os.getenv('GROQ_TOKEN') or os.getenv('Groq_TOKEN')
     openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
     
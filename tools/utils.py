@@ -1,6 +1,5 @@
 from pyannote.audio import Pipeline
 from audio_separator.separator import Separator
-import whisper
 from transformers import MarianMTModel, MarianTokenizer
 from TTS.api import TTS
 from pydub import AudioSegment
@@ -22,6 +21,56 @@ import ffmpeg
 from IPython.display import clear_output 
 import sys, argparse
 import os
+import bisect
+import itertools
+import urllib.request
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Segments:
+            """Struct-of-arrays layout for per-segment metadata.
+
+            Keeping the timestamps in parallel numpy arrays lets timing math
+            (durations, gaps, silence budgets) run as vectorized expressions
+            instead of per-segment Python loops.
+            """
+            starts: np.ndarray
+            ends: np.ndarray
+            texts: list = field(default_factory=list)
+            translations: list = field(default_factory=list)
+
+            @classmethod
+            def from_rows(cls, rows):
+                """Build from [text, start, end] rows as produced by alignment."""
+                return cls(
+                    starts=np.array([row[1] for row in rows], dtype=np.float64),
+                    ends=np.array([row[2] for row in rows], dtype=np.float64),
+                    texts=[row[0] for row in rows],
+                )
+
+            def __len__(self):
+                return len(self.starts)
+
+            @property
+            def durations(self):
+                return self.ends - self.starts
+
+            @property
+            def gaps(self):
+                """Silence between consecutive segments, clamped at zero."""
+                return np.maximum(self.starts[1:] - self.ends[:-1], 0)
+
+
+def fresh_dir(path):
+            """Recreate `path` as an empty directory.
+
+            Single in-process call replacing the `os.system("rm -r ...")` /
+            `os.system("mkdir ...")` pairs, which fork a shell each.
+            """
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path, exist_ok=True)
+
 
 def merge_overlapping_periods(period_dict):
             # Sort periods by start time
@@ -51,6 +100,32 @@ def merge_overlapping_periods(period_dict):
             # Convert back to dictionary
             return dict(merged_periods)
 	
+def align_sentences_to_words(sentences, time_stamped, full_text):
+            """Map each tokenized sentence to its [start, end] time span.
+
+            Works in a single linear pass: the cumulative character offsets of the
+            word timestamps are computed once, then each sentence's character span
+            in `full_text` is located with `str.find` from a moving cursor and the
+            covering words are looked up with `bisect`.
+            """
+            word_char_ends = list(itertools.accumulate(len(word[0]) for word in time_stamped))
+            time_stamped_sentences = {}
+            cursor = 0
+
+            for sentence in sentences:
+                position = full_text.find(sentence, cursor)
+                if position == -1:
+                    position = cursor
+
+                first = min(bisect.bisect_right(word_char_ends, position), len(time_stamped) - 1)
+                last = min(bisect.bisect_left(word_char_ends, position + len(sentence)), len(time_stamped) - 1)
+
+                time_stamped_sentences[sentence] = [time_stamped[first][1], time_stamped[last][2]]
+                cursor = position + len(sentence)
+
+            return time_stamped_sentences
+
+
 def get_speaker(time_frame, speaker_dict):
                 for (start, end), speaker in speaker_dict.items():
                     if start <= time_frame <= end:
@@ -58,6 +133,34 @@ def get_speaker(time_frame, speaker_dict):
                 return None
 
 
+def get_frame_speakers(total_frames, fps, speaker_dict):
+                """Vectorized `get_speaker` for every video frame at once.
+
+                Sorts the speaker intervals once and maps all frame timestamps with a
+                single `np.searchsorted` instead of one linear scan per frame. The
+                result is run-length encoded as `[[start_frame, end_frame, speaker],
+                ...]` since the labels come in long runs of the same speaker.
+                """
+                if total_frames == 0:
+                    return []
+
+                intervals = sorted(speaker_dict.items(), key=lambda item: item[0][0])
+                starts = np.array([period[0] for period, _ in intervals])
+                ends = np.array([period[1] for period, _ in intervals])
+                labels = np.array([speaker for _, speaker in intervals], dtype=object)
+
+                times = np.arange(total_frames) / round(fps)
+                idx = np.searchsorted(starts, times, side='right') - 1
+                valid = (idx >= 0) & (times <= ends[idx])
+                per_frame = np.where(valid, labels[idx], None)
+
+                changes = np.where(per_frame[1:] != per_frame[:-1])[0] + 1
+                run_starts = np.concatenate([[0], changes])
+                run_ends = np.concatenate([changes, [total_frames]])
+                return [[int(start), int(end), per_frame[start]]
+                        for start, end in zip(run_starts, run_ends)]
+
+
 def extract_frames(video_path, output_folder, periods, num_frames=50):
                 # Open the video file
                 video = cv2.VideoCapture(video_path)
@@ -138,6 +241,124 @@ def detect_and_crop_faces(image_path, face_cascade):
                 cv2.imwrite(image_path, face)
                 return True
 
+_DNN_FACE_MODEL_URLS = {
+    "opencv_face_detector_uint8.pb":
+        "https://github.com/opencv/opencv_3rdparty/raw/dnn_samples_face_detector_20180220_uint8/"
+        "opencv_face_detector_uint8.pb",
+    "opencv_face_detector.pbtxt":
+        "https://raw.githubusercontent.com/opencv/opencv/master/samples/dnn/face_detector/"
+        "opencv_face_detector.pbtxt",
+}
+
+
+def _ensure_dnn_face_model():
+                """Return (model_path, config_path) for the DNN detector, fetching on first use.
+
+                The files are small (~2.7 MB total) and are downloaded once into
+                models/, like the other weights this project fetches at runtime.
+                Returns None when they are absent and cannot be retrieved.
+                """
+                paths = []
+                for filename, url in _DNN_FACE_MODEL_URLS.items():
+                    # Accept a copy in the working directory for setups that
+                    # already vendored the files there
+                    if os.path.exists(filename):
+                        paths.append(filename)
+                        continue
+                    target = os.path.join("models", filename)
+                    if not os.path.exists(target):
+                        try:
+                            os.makedirs("models", exist_ok=True)
+                            urllib.request.urlretrieve(url, target)
+                        except Exception as e:
+                            print(f"Could not download {filename}: {e}")
+                            return None
+                    paths.append(target)
+                return tuple(paths)
+
+
+def create_face_detector():
+                """Build the fastest available face detector.
+
+                Prefers OpenCV's DNN detector (run on CUDA in FP16 when a GPU build
+                of OpenCV is present) and falls back to the CPU Haar cascade when
+                the DNN model files are not on disk and cannot be downloaded.
+                """
+                model_files = _ensure_dnn_face_model()
+                if model_files is not None:
+                    model_path, config_path = model_files
+                    net = cv2.dnn.readNet(model_path, config_path)
+                    if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+                        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+                    return ('dnn', net)
+
+                haar_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+                return ('haar', cv2.CascadeClassifier(haar_cascade_path))
+
+
+def detect_and_crop_faces_batch(image_paths, detector, confidence_threshold=0.7):
+                """Detect and crop faces for a batch of images in place.
+
+                With the DNN detector every image goes through one stacked
+                `blobFromImages` forward pass; the Haar fallback detects per image.
+                Returns the paths where no face was found (candidates for deletion).
+                """
+                kind, model = detector
+
+                if kind == 'haar':
+                    return [image_path for image_path in image_paths
+                            if not detect_and_crop_faces(image_path, model)]
+
+                images = []
+                valid_paths = []
+                failed = []
+                for image_path in image_paths:
+                    img = cv2.imread(image_path)
+                    if img is None:
+                        print(f"Error reading image: {image_path}")
+                        failed.append(image_path)
+                        continue
+                    images.append(img)
+                    valid_paths.append(image_path)
+
+                if not images:
+                    return failed
+
+                blob = cv2.dnn.blobFromImages([cv2.resize(img, (300, 300)) for img in images],
+                                              1.0, (300, 300), (104, 117, 123))
+                model.setInput(blob)
+                detections = model.forward()
+
+                # Detection rows are (image_idx, class, confidence, x1, y1, x2, y2)
+                best = {}
+                for detection in detections[0, 0]:
+                    image_idx = int(detection[0])
+                    confidence = float(detection[2])
+                    if confidence >= confidence_threshold and confidence > best.get(image_idx, (0, None))[0]:
+                        best[image_idx] = (confidence, detection[3:7])
+
+                for idx, (img, image_path) in enumerate(zip(images, valid_paths)):
+                    if idx not in best:
+                        failed.append(image_path)
+                        continue
+
+                    height, width = img.shape[:2]
+                    x1, y1, x2, y2 = best[idx][1]
+                    x1 = max(0, int(x1 * width))
+                    y1 = max(0, int(y1 * height))
+                    x2 = min(width, int(x2 * width))
+                    y2 = min(height, int(y2 * height))
+
+                    if x2 <= x1 or y2 <= y1:
+                        failed.append(image_path)
+                        continue
+
+                    cv2.imwrite(image_path, img[y1:y2, x1:x2])
+
+                return failed
+
+
 def cosine_similarity(embedding1, embedding2):
                 """Calculate cosine similarity between two face embeddings"""
                 embedding1 = np.array(embedding1)